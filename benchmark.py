@@ -0,0 +1,297 @@
+#This program implements the following:
+#    Benchmark suite for the parse, tokenize, build (naive vs SPIMI), compression-table and query stages,
+#    with optional cProfile/tracemalloc hooks and machine-readable JSON results
+
+import os
+import sys
+import json
+import time
+import cProfile
+import platform
+import argparse
+import tracemalloc
+import multiprocessing
+from datetime import datetime
+from document_parser import ReutersParser
+from naive_indexer import NaiveIndexer
+from spimi_indexer import SPIMIIndexer
+from dictionary_compression import generate_compression_table
+from wildcard_query import PermutermIndex
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak RSS is then reported as None
+    resource = None
+
+INDEXERS = {
+    "naive": NaiveIndexer,
+    "spimi": SPIMIIndexer
+}
+
+class Benchmark:
+    def __init__(self, dataset_path, query_log, indexers=("naive", "spimi"), skip=(), repeat=3,
+                 profile_dir=None, trace_memory=False):
+        self.dataset_path = dataset_path
+        self.query_log = query_log
+        self.indexer_names = list(indexers)
+        self.skip = set(skip)
+        self.repeat = repeat
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.parser = None
+        self.results = {
+            'environment': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'dataset_path': dataset_path,
+                'query_log': query_log,
+                'repeat': repeat,
+                'profiling': profile_dir is not None,
+                'tracemalloc': trace_memory
+            },
+            'stages': {},
+            'indexes': {},
+            'queries': {}
+        }
+
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+
+    def peak_rss_mb(self):
+        # On Linux ru_maxrss carries the parent's peak into a child process, VmHWM is the child's own
+        if os.path.exists("/proc/self/status"):
+            with open("/proc/self/status", 'r') as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) / 1024
+
+        if resource is None:
+            return None
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        if sys.platform == "darwin":
+            peak /= 1024
+        return peak / 1024
+
+    def run_stage(self, name, func, *args):
+        # Wall time and peak RSS for every stage, cProfile and tracemalloc only when asked for
+        profiler = cProfile.Profile() if self.profile_dir else None
+        peak_before = self.peak_rss_mb()
+        if self.trace_memory:
+            tracemalloc.start()
+
+        start_time = time.perf_counter()
+        if profiler:
+            profiler.enable()
+
+        result = func(*args)
+
+        if profiler:
+            profiler.disable()
+        elapsed = time.perf_counter() - start_time
+
+        # ru_maxrss only ever goes up, so the stage's own share is how far it raised the process peak
+        peak_after = self.peak_rss_mb()
+        stage = {
+            'seconds': elapsed,
+            'process_peak_rss_mb': peak_after,
+            'peak_rss_growth_mb': peak_after - peak_before if peak_after is not None else None
+        }
+
+        if profiler:
+            profile_path = os.path.join(self.profile_dir, f"{name}.prof")
+            profiler.dump_stats(profile_path)
+            stage['profile'] = profile_path
+
+        if self.trace_memory:
+            _, traced_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            stage['traced_peak_mb'] = traced_peak / (1024 * 1024)
+
+        self.results['stages'][name] = stage
+        print(f"{name}: {elapsed:.2f} seconds")
+        return result
+
+    def percentile(self, sorted_values, percent):
+        # Nearest-rank percentile
+        if not sorted_values:
+            return 0
+        rank = max(1, int(round(percent / 100 * len(sorted_values))))
+        return sorted_values[min(rank, len(sorted_values)) - 1]
+
+    def load_query_log(self):
+        # One query per line, terms joined with AND, '*' for wildcards, '#' for comments
+        with open(self.query_log, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+    def tokenize_corpus(self, indexer):
+        tokens = 0
+        for document in self.parser.documents:
+            tokens += len(indexer.tokenize(document.get_content()))
+        return tokens
+
+    def index_statistics(self, indexer):
+        total_postings = 0
+        serialized_bytes = 0
+        # The dictionary's hash table, the term strings and the postings list objects
+        memory_bytes = sys.getsizeof(indexer.postings_list)
+        doc_id_objects = {}
+
+        for term, postings in indexer.postings_list.items():
+            total_postings += len(postings)
+            memory_bytes += sys.getsizeof(term) + sys.getsizeof(postings)
+            # docID strings are shared between postings lists, so each string object is counted once
+            for doc_id in postings:
+                doc_id_objects[id(doc_id)] = doc_id
+            # Postings as save_index writes them: "term -> ['1', '5', ...]"
+            serialized_bytes += len(f"{term} -> {postings}\n".encode('utf-8'))
+
+        memory_bytes += sum(sys.getsizeof(doc_id) for doc_id in doc_id_objects.values())
+
+        return {
+            'vocabulary_size': len(indexer.postings_list),
+            'total_postings': total_postings,
+            'memory_bytes': memory_bytes,
+            'memory_bytes_per_posting': memory_bytes / total_postings if total_postings > 0 else 0,
+            'serialized_bytes': serialized_bytes,
+            'serialized_bytes_per_posting': serialized_bytes / total_postings if total_postings > 0 else 0
+        }
+
+    def run_query(self, indexer, permuterm_index, query):
+        terms = query.split("AND")
+
+        if "*" in query:
+            if len(terms) > 1:
+                return permuterm_index.search_and_query(terms)
+            return permuterm_index.search_wildcard(query)
+
+        if len(terms) > 1:
+            return indexer.search_and_query(terms)
+        return indexer.search_term(query)
+
+    def replay_queries(self, indexer, permuterm_index, queries):
+        # One warm-up pass, then every query of the log is replayed `repeat` times
+        for query in queries:
+            self.run_query(indexer, permuterm_index, query)
+
+        latencies = []
+        result_count = 0
+        start_time = time.perf_counter()
+        for _ in range(self.repeat):
+            for query in queries:
+                query_start = time.perf_counter()
+                docs = self.run_query(indexer, permuterm_index, query)
+                latencies.append((time.perf_counter() - query_start) * 1000)
+                result_count += len(docs)
+        elapsed = time.perf_counter() - start_time
+
+        latencies.sort()
+        return {
+            'queries': len(latencies),
+            'seconds': elapsed,
+            'throughput_qps': len(latencies) / elapsed if elapsed > 0 else 0,
+            'p50_ms': self.percentile(latencies, 50),
+            'p95_ms': self.percentile(latencies, 95),
+            'p99_ms': self.percentile(latencies, 99),
+            'max_ms': latencies[-1] if latencies else 0,
+            'average_results': result_count / len(latencies) if latencies else 0
+        }
+
+    def run_indexer(self, name, run_tokenize):
+        # Runs in a child process: parse, build one indexer, then every stage that needs it.
+        # The child parses for itself, unpickling a parsed corpus would spike its peak RSS before the build
+        self.results['stages'] = {}
+        self.results['indexes'] = {}
+        self.results['queries'] = {}
+
+        self.parser = self.run_stage(f"parse_{name}", ReutersParser, self.dataset_path)
+        indexer = self.run_stage(f"build_{name}", INDEXERS[name], self.dataset_path, self.parser)
+        self.results['indexes'][name] = self.index_statistics(indexer)
+
+        if run_tokenize:
+            tokens = self.run_stage(f"tokenize_{name}", self.tokenize_corpus, indexer)
+            tokenize_stage = self.results['stages'][f"tokenize_{name}"]
+            tokenize_stage['tokens'] = tokens
+            tokenize_stage['tokens_per_second'] = tokens / tokenize_stage['seconds']
+
+        if name == "naive" and "compression" not in self.skip:
+            compression_results = self.run_stage(f"compression_{name}", generate_compression_table, indexer)
+            self.results['stages'][f"compression_{name}"]['table'] = compression_results
+
+        if name in self.indexer_names and "query" not in self.skip:
+            permuterm_index = self.run_stage(f"permuterm_{name}", PermutermIndex, indexer)
+            self.results['queries'][name] = self.run_stage(f"query_{name}", self.replay_queries,
+                                                           indexer, permuterm_index, self.load_query_log())
+
+        child_results = {key: self.results[key] for key in ('stages', 'indexes', 'queries')}
+        child_results['document_count'] = len(self.parser.documents)
+        return child_results
+
+    def run(self):
+        # Parsing happens in the children only, so the corpus is never sent along with this object
+        # The compression table is generated from the naive index
+        needed = list(self.indexer_names)
+        if "compression" not in self.skip and "naive" not in needed:
+            needed.append("naive")
+
+        # Every indexer gets a fresh interpreter, so its peak RSS is not inflated by the other
+        # indexer and no index is kept alive in this process
+        context = multiprocessing.get_context("spawn")
+        for position, name in enumerate(needed):
+            pool = context.Pool(1)
+            child_results = pool.apply(self.run_indexer, (name, position == 0 and "tokenize" not in self.skip))
+            pool.close()
+            pool.join()
+
+            for key in ('stages', 'indexes', 'queries'):
+                self.results[key].update(child_results[key])
+            self.results['environment'].setdefault('document_count', child_results['document_count'])
+
+        return self.results
+
+    def print_summary(self):
+        print("\nBENCHMARK SUMMARY")
+        print(f"{'Stage':<24} {'Seconds':<12} {'Process peak RSS (MB)':<23} {'Stage growth (MB)':<18}")
+        for name, stage in self.results['stages'].items():
+            peak_rss = f"{stage['process_peak_rss_mb']:.1f}" if stage['process_peak_rss_mb'] is not None else "n/a"
+            growth = f"{stage['peak_rss_growth_mb']:.1f}" if stage['peak_rss_growth_mb'] is not None else "n/a"
+            print(f"{name:<24} {stage['seconds']:<12.2f} {peak_rss:<23} {growth:<18}")
+
+        print(f"\n{'Index':<10} {'Terms':<12} {'Postings':<12} {'Memory B/posting':<18} {'Saved B/posting':<16}")
+        for name, stats in self.results['indexes'].items():
+            print(f"{name:<10} {stats['vocabulary_size']:<12} {stats['total_postings']:<12} "
+                  f"{stats['memory_bytes_per_posting']:<18.2f} {stats['serialized_bytes_per_posting']:<16.2f}")
+
+        if self.results['queries']:
+            print(f"\n{'Index':<10} {'Queries':<10} {'QPS':<12} {'p50 ms':<10} {'p95 ms':<10} {'p99 ms':<10}")
+            for name, stats in self.results['queries'].items():
+                print(f"{name:<10} {stats['queries']:<10} {stats['throughput_qps']:<12.1f} "
+                      f"{stats['p50_ms']:<10.3f} {stats['p95_ms']:<10.3f} {stats['p99_ms']:<10.3f}")
+
+    def save_results(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2)
+
+        print(f"\nBenchmark results saved to {filename}")
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description="Benchmark the Reuters-21578 indexing and query pipeline")
+    argument_parser.add_argument("--dataset", default="./reuters21578")
+    argument_parser.add_argument("--queries", default="query_log.txt", help="query log to replay, one query per line")
+    argument_parser.add_argument("--indexers", nargs="+", choices=list(INDEXERS), default=list(INDEXERS))
+    argument_parser.add_argument("--skip", nargs="+", choices=["tokenize", "compression", "query"], default=[],
+                                 help="stages to leave out (compression takes several minutes)")
+    argument_parser.add_argument("--repeat", type=int, default=3, help="times the query log is replayed")
+    argument_parser.add_argument("--profile", metavar="DIR", help="write a cProfile .prof file per stage to DIR")
+    argument_parser.add_argument("--tracemalloc", action="store_true", help="record traced peak memory per stage (slow)")
+    argument_parser.add_argument("--output", default="benchmark_results.json")
+    args = argument_parser.parse_args()
+
+    benchmark = Benchmark(args.dataset, args.queries, args.indexers, args.skip, args.repeat,
+                          args.profile, args.tracemalloc)
+    benchmark.run()
+    benchmark.print_summary()
+    benchmark.save_results(args.output)
@@ -1,15 +1,25 @@
 import re
 import os
+from datetime import datetime
 from tqdm import tqdm
 from xml.sax.saxutils import unescape
 
 class ReutersDocument:    
-    def __init__(self, doc_id, title, body, date_loc, author):
+    def __init__(self, doc_id, title, body, date_loc, author, date=None, topics=None, places=None, orgs=None,
+                 source_file=None, offset=0, length=0):
         self.doc_id = doc_id
         self.title = title
         self.body = body
         self.date_loc = date_loc
         self.author = author
+        self.date = date
+        self.topics = topics or []
+        self.places = places or []
+        self.orgs = orgs or []
+        # Location of the <REUTERS> element in the source .sgm file
+        self.source_file = source_file
+        self.offset = offset
+        self.length = length
     
     def get_content(self):
         content = []
@@ -70,11 +80,36 @@ class ReutersParser:
         
         return title, body, date_loc, author
     
+    def extract_categories(self, reuters_content, tag):
+        # Category lists are stored as <TAG><D>value</D>...</TAG>
+        category_match = re.search(rf'<{tag}>(.*?)</{tag}>', reuters_content, re.DOTALL)
+        if not category_match:
+            return []
+        return [self.clean_text(value) for value in re.findall(r'<D>(.*?)</D>', category_match.group(1), re.DOTALL)]
+    
+    def extract_metadata(self, reuters_content):
+        # Extract date, topics, places and orgs from the elements outside the text element.
+        date = None
+        date_match = re.search(r'<DATE>\s*(\d{1,2}-[A-Za-z]{3}-\d{4})\s+(\d+:\d{2}:\d{2})', reuters_content)
+        if date_match:
+            try:
+                date = datetime.strptime(f"{date_match.group(1)} {date_match.group(2)}", "%d-%b-%Y %H:%M:%S")
+            except ValueError:
+                # A few stamps have a garbled time, keep just the day for those
+                date = datetime.strptime(date_match.group(1), "%d-%b-%Y")
+        
+        topics = self.extract_categories(reuters_content, "TOPICS")
+        places = self.extract_categories(reuters_content, "PLACES")
+        orgs = self.extract_categories(reuters_content, "ORGS")
+        
+        return date, topics, places, orgs
+    
     def parse_file(self, filename):
         documents = []
         filepath = os.path.join(self.dataset_path, filename)
     
-        with open(filepath, 'r', encoding='latin-1') as file:
+        # latin-1 without newline translation keeps character offsets equal to byte offsets
+        with open(filepath, 'r', encoding='latin-1', newline='') as file:
                 content = file.read()
         
         # Find all Reuters elements
@@ -90,14 +125,18 @@ class ReutersParser:
             if text_match:
                 text_content = text_match.group(1)
                 title, body, date_loc, author = self.extract_text_content(text_content)                
+            
+            date, topics, places, orgs = self.extract_metadata(reuters_content)
                 
-            documents.append(ReutersDocument(newid, title, body, date_loc, author))
+            documents.append(ReutersDocument(newid, title, body, date_loc, author, date, topics, places, orgs,
+                                             filename, match.start(), match.end() - match.start()))
 
         return documents
 
     def parse_all_files(self):
         # Get all .sgm files
-        sgm_files = [f for f in os.listdir(self.dataset_path) if f.endswith('.sgm')]
+        # Sorted so documents (and postings) come out in NEWID order
+        sgm_files = sorted(f for f in os.listdir(self.dataset_path) if f.endswith('.sgm'))
         
         print(f"Processing files")
         for file in tqdm(sgm_files):
@@ -108,14 +147,17 @@ if __name__ == "__main__":
 
     print(f"\nTotal documents: {len(parser.documents)}")
 
+    # Look documents up by NEWID rather than by position in the list
+    documents_by_id = {int(document.doc_id): document for document in parser.documents}
+
     while True:
         try:
             doc_id = int(input(f"\nEnter a document ID between 1 and {len(parser.documents)} (0 to exit): "))
             if doc_id == 0:
                 break
-            if 1 <= doc_id <= len(parser.documents):
+            if doc_id in documents_by_id:
                 print(f"\nDocument {doc_id} content:\n")
-                print(parser.documents[doc_id - 1].get_content())
+                print(documents_by_id[doc_id].get_content())
             else:
                 print("Invalid document ID. Please try again.")
         except ValueError:
@@ -0,0 +1,235 @@
+#This program implements the following:
+#    Document store with a docID offset table and block-compressed stored fields,
+#    used to fetch result pages and query-term snippets without re-parsing the corpus
+
+import re
+import os
+import sys
+import json
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+import document_parser
+from document_parser import ReutersDocument, ReutersParser
+
+# Bump when the stored fields or the table layout change so old stores are rebuilt
+STORE_VERSION = 1
+
+class DocumentStore:
+    def __init__(self, dataset_path, store_path="document_store.bin", block_size=16, cached_blocks=64, rebuild=False):
+        self.dataset_path = dataset_path
+        self.store_path = store_path
+        self.table_path = os.path.splitext(store_path)[0] + ".idx"
+        self.block_size = block_size
+        self.cached_blocks = cached_blocks
+        # docID -> (source file, offset, length, block number, position in block)
+        self.doc_table = {}
+        # block number -> (offset, length) in the store file
+        self.block_table = []
+        self.block_cache = OrderedDict()
+
+        # The corpus is parsed only when there is no store for the current dataset and parser yet
+        if rebuild or not self.load_table():
+            self.build_store()
+
+    def source_signature(self):
+        # Size and modification time of every .sgm file and of the parser that produced the stored fields
+        sources = {}
+        sgm_files = sorted(f for f in os.listdir(self.dataset_path) if f.endswith('.sgm'))
+        for filepath in [os.path.join(self.dataset_path, f) for f in sgm_files] + [document_parser.__file__]:
+            stat = os.stat(filepath)
+            sources[os.path.basename(filepath)] = [stat.st_size, stat.st_mtime_ns]
+
+        return {
+            'version': STORE_VERSION,
+            'dataset_path': os.path.abspath(self.dataset_path),
+            'sources': sources
+        }
+
+    def build_store(self):
+        print("Building document store")
+        parser = ReutersParser(self.dataset_path)
+
+        with open(self.store_path, 'wb') as store:
+            for start in range(0, len(parser.documents), self.block_size):
+                block = parser.documents[start:start + self.block_size]
+
+                for position, document in enumerate(block):
+                    self.doc_table[int(document.doc_id)] = (document.source_file, document.offset,
+                                                            document.length, len(self.block_table), position)
+
+                # Stored fields of a block are compressed together so neighbouring documents share the dictionary
+                data = zlib.compress(json.dumps([self.document_to_fields(document) for document in block]).encode('utf-8'))
+                self.block_table.append((store.tell(), len(data)))
+                store.write(data)
+
+        self.save_table()
+        print(f"Document store saved to {self.store_path}")
+
+    def save_table(self):
+        with open(self.table_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'signature': self.source_signature(),
+                'block_size': self.block_size,
+                'blocks': self.block_table,
+                'documents': self.doc_table
+            }, f)
+
+    def load_table(self):
+        # Returns False when the store is missing or was built from another dataset, parser or store version
+        if not (os.path.exists(self.store_path) and os.path.exists(self.table_path)):
+            return False
+
+        try:
+            with open(self.table_path, 'r', encoding='utf-8') as f:
+                table = json.load(f)
+        except ValueError:
+            return False
+
+        if table.get('signature') != self.source_signature():
+            print("Document store is out of date")
+            return False
+
+        self.block_size = table['block_size']
+        self.block_table = [tuple(block) for block in table['blocks']]
+        self.doc_table = {int(doc_id): tuple(entry) for doc_id, entry in table['documents'].items()}
+        return True
+
+    def document_to_fields(self, document):
+        return {
+            'doc_id': document.doc_id,
+            'title': document.title,
+            'body': document.body,
+            'date_loc': document.date_loc,
+            'author': document.author,
+            'date': document.date.isoformat() if document.date else None,
+            'topics': document.topics,
+            'places': document.places,
+            'orgs': document.orgs
+        }
+
+    def fields_to_document(self, fields, doc_id):
+        source_file, offset, length, _, _ = self.doc_table[doc_id]
+        return ReutersDocument(fields['doc_id'], fields['title'], fields['body'], fields['date_loc'], fields['author'],
+                               datetime.fromisoformat(fields['date']) if fields['date'] else None,
+                               fields['topics'], fields['places'], fields['orgs'],
+                               source_file, offset, length)
+
+    def read_block(self, block_no):
+        if block_no in self.block_cache:
+            self.block_cache.move_to_end(block_no)
+            return self.block_cache[block_no]
+
+        offset, length = self.block_table[block_no]
+        with open(self.store_path, 'rb') as store:
+            store.seek(offset)
+            block = json.loads(zlib.decompress(store.read(length)).decode('utf-8'))
+
+        self.block_cache[block_no] = block
+        if len(self.block_cache) > self.cached_blocks:
+            self.block_cache.popitem(last=False)
+        return block
+
+    #Random access fetch
+    def fetch(self, doc_id):
+        doc_id = int(doc_id)
+        if doc_id not in self.doc_table:
+            return None
+
+        _, _, _, block_no, position = self.doc_table[doc_id]
+        return self.fields_to_document(self.read_block(block_no)[position], doc_id)
+
+    #Batched fetch for a result page, each block is read and decompressed once
+    def fetch_batch(self, doc_ids):
+        by_block = {}
+        for doc_id in doc_ids:
+            doc_id = int(doc_id)
+            if doc_id in self.doc_table:
+                by_block.setdefault(self.doc_table[doc_id][3], []).append(doc_id)
+
+        documents = {}
+        for block_no in sorted(by_block):
+            block = self.read_block(block_no)
+            for doc_id in by_block[block_no]:
+                documents[doc_id] = self.fields_to_document(block[self.doc_table[doc_id][4]], doc_id)
+
+        # Keep the order of the result list
+        return [documents[int(doc_id)] for doc_id in doc_ids if int(doc_id) in documents]
+
+    def fetch_raw(self, doc_id):
+        # The original <REUTERS> element, read straight from its .sgm file
+        doc_id = int(doc_id)
+        if doc_id not in self.doc_table:
+            return None
+
+        source_file, offset, length, _, _ = self.doc_table[doc_id]
+        with open(os.path.join(self.dataset_path, source_file), 'rb') as file:
+            file.seek(offset)
+            return file.read(length).decode('latin-1')
+
+    def snippet(self, document, terms, width=80):
+        # Window of text around the first query term found in the document, with query terms in [brackets]
+        text = document.body or document.get_content()
+        terms = [term.strip() for term in terms if term.strip()]
+        if not terms:
+            return text[:2 * width] + ("..." if len(text) > 2 * width else "")
+
+        # Lookarounds instead of \b so terms that start or end with punctuation (U.S.) still match,
+        # longest terms first so a shorter term does not cut a longer match short
+        alternatives = '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+        pattern = re.compile(r'(?<!\w)(' + alternatives + r')(?!\w)', re.IGNORECASE)
+        match = pattern.search(text)
+        if not match:
+            return text[:2 * width] + ("..." if len(text) > 2 * width else "")
+
+        start = max(0, match.start() - width)
+        end = min(len(text), match.end() + width)
+        window = pattern.sub(lambda found: f"[{found.group(0)}]", text[start:end])
+        return ("..." if start > 0 else "") + window + ("..." if end < len(text) else "")
+
+    def render_page(self, doc_ids, terms=None, page=1, page_size=10):
+        start_time = time.perf_counter()
+
+        page_ids = doc_ids[(page - 1) * page_size:page * page_size]
+        lines = []
+        for document in self.fetch_batch(page_ids):
+            date = document.date.strftime("%d-%b-%Y") if document.date else ""
+            lines.append(f"[{document.doc_id}] {document.title} ({date})")
+            lines.append(f"    {self.snippet(document, terms or [])}")
+
+        print("\n".join(lines))
+        print(f"Page {page}: {len(page_ids)} of {len(doc_ids)} documents rendered in {(time.perf_counter() - start_time) * 1000:.2f} ms")
+
+    def get_statistics(self):
+        return {
+            'document_count': len(self.doc_table),
+            'block_count': len(self.block_table),
+            'block_size': self.block_size,
+            'store_bytes': os.path.getsize(self.store_path)
+        }
+
+if __name__ == "__main__":
+    # Pass "rebuild" to re-parse the corpus and rewrite the store
+    rebuild = len(sys.argv) > 1 and sys.argv[1] == "rebuild"
+
+    start_time = time.time()
+    store = DocumentStore(dataset_path="./reuters21578", rebuild=rebuild)
+    print(f"Document store ready in {time.time() - start_time:.2f} seconds")
+    print(store.get_statistics())
+
+    while True:
+        query = input("\nEnter document IDs separated by commas, optionally followed by query terms (e.g. '22,793 copper') (or '0' to quit): ")
+
+        if query == '0':
+            break
+
+        if query:
+            doc_ids, _, terms = query.strip().partition(" ")
+            try:
+                doc_ids = [int(doc_id) for doc_id in doc_ids.split(",") if doc_id.strip()]
+            except ValueError:
+                print("Please enter valid integer document IDs.")
+                continue
+
+            store.render_page(doc_ids, terms.split(), page_size=len(doc_ids))
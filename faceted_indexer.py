@@ -0,0 +1,258 @@
+#This program implements the following:
+#    Field-aware postings (title:COPPER) with topic, place and org facet bitmaps and a sorted date column
+
+import re
+import os
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from tqdm import tqdm
+from document_parser import ReutersParser
+
+class FacetedIndexer:
+    def __init__(self, dataset_path):
+        self.dataset_path = dataset_path
+        self.parser = ReutersParser(dataset_path)
+        self.facets = ["topics", "places", "orgs"]
+        self.postings_list = {}
+        self.facet_bitmaps = {}
+        self.date_column = []
+        self.date_doc_ids = []
+        self.all_docs_bitmap = 0
+        self.document_count = 0
+        self.document_process_time = 0
+        self.build_index()
+
+    def build_index(self):
+        print("Starting Faceted Indexer")
+
+        # Category names listed with the collection, e.g. all-topics-strings.lc.txt
+        self.load_facet_values()
+
+        # Build fielded postings, facet bitmaps and the date column in one pass over the documents
+        self.create_fielded_index()
+        self.sort_date_column()
+
+    def load_facet_values(self):
+        for facet in self.facets:
+            values = []
+            filepath = os.path.join(self.dataset_path, f"all-{facet}-strings.lc.txt")
+            if os.path.exists(filepath):
+                with open(filepath, 'r', encoding='latin-1') as file:
+                    values = [line.strip() for line in file if line.strip()]
+
+            self.facet_bitmaps[facet] = {value: 0 for value in values}
+
+    def tokenize(self, text):
+        if not text:
+            return []
+
+        text = re.sub(r'[^\w\s]', ' ', text)
+        return text.split(" ")
+
+    def add_posting(self, term, doc_id):
+        if term not in self.postings_list:
+            self.postings_list[term] = []
+
+        if not self.postings_list[term] or self.postings_list[term][-1] != doc_id:
+            self.postings_list[term].append(doc_id)
+
+    def create_fielded_index(self):
+        start_time = time.time()
+        for document in tqdm(self.parser.documents):
+            self.document_count += 1
+            doc_bit = 1 << int(document.doc_id)
+            self.all_docs_bitmap |= doc_bit
+
+            # Every token is posted under its field (title:COPPER) and unfielded (COPPER)
+            field_texts = {
+                "title": document.title,
+                "dateline": document.date_loc,
+                "author": document.author,
+                "body": document.body
+            }
+            for field, text in field_texts.items():
+                for token in self.tokenize(text):
+                    if token.strip():
+                        self.add_posting(f"{field}:{token}", document.doc_id)
+                        self.add_posting(token, document.doc_id)
+
+            # One bit per NEWID in each facet value's bitmap
+            for facet in self.facets:
+                for value in getattr(document, facet):
+                    self.facet_bitmaps[facet][value] = self.facet_bitmaps[facet].get(value, 0) | doc_bit
+
+            if document.date:
+                self.date_column.append((document.date, int(document.doc_id)))
+
+            if(self.document_count == 10000):
+                self.document_process_time = time.time() - start_time
+
+    def sort_date_column(self):
+        self.date_column.sort()
+        self.date_doc_ids = [doc_id for _, doc_id in self.date_column]
+        self.date_column = [date for date, _ in self.date_column]
+
+    def postings_to_bitmap(self, postings):
+        bitmap = 0
+        for doc_id in postings:
+            bitmap |= 1 << int(doc_id)
+        return bitmap
+
+    def bitmap_to_postings(self, bitmap):
+        # Bit i is NEWID i, read from the least significant end of the binary string
+        bits = bin(bitmap)[:1:-1]
+        return [str(doc_id) for doc_id, bit in enumerate(bits) if bit == "1"]
+
+    def facet_bitmap(self, facet, values):
+        # Documents carrying any of the requested values
+        bitmap = 0
+        for value in values:
+            bitmap |= self.facet_bitmaps[facet].get(value.strip().lower(), 0)
+        return bitmap
+
+    def parse_date(self, value):
+        # Raises ValueError for anything that is not "YYYY-MM-DD"
+        try:
+            return datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError(f"Invalid date '{value}', dates must be written as YYYY-MM-DD")
+
+    def date_range_bitmap(self, date_from=None, date_to=None):
+        # Dates are "YYYY-MM-DD" and both ends are inclusive
+        start = 0
+        end = len(self.date_column)
+        if date_from:
+            start = bisect_left(self.date_column, self.parse_date(date_from))
+        if date_to:
+            end = bisect_left(self.date_column, self.parse_date(date_to) + timedelta(days=1))
+
+        bitmap = 0
+        for doc_id in self.date_doc_ids[start:end]:
+            bitmap |= 1 << doc_id
+        return bitmap
+
+    #Single Term Querying (fielded terms such as title:COPPER are looked up directly)
+    def search_term(self, term):
+        term = term.strip()
+        return self.postings_list.get(term, [])
+
+    #Filtered AND Querying
+    def search(self, terms=None, filters=None, date_from=None, date_to=None):
+        # filters maps a facet to the values to keep, e.g. {"topics": ["copper"], "places": ["usa"]}
+        result = self.all_docs_bitmap
+
+        for term in terms or []:
+            result &= self.postings_to_bitmap(self.search_term(term))
+            if not result:
+                return []
+
+        for facet, values in (filters or {}).items():
+            result &= self.facet_bitmap(facet, values)
+
+        if date_from or date_to:
+            result &= self.date_range_bitmap(date_from, date_to)
+
+        return self.bitmap_to_postings(result)
+
+    def facet_counts(self, docs, facet, top=10):
+        # Intersect the result set's bitmap with each value's bitmap and count the set bits
+        result = self.postings_to_bitmap(docs)
+        counts = {}
+        for value, bitmap in self.facet_bitmaps[facet].items():
+            count = (result & bitmap).bit_count()
+            if count:
+                counts[value] = count
+
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:top]
+
+    def parse_query(self, query):
+        # Example: title:COPPER AND gold topics:copper places:usa date:1987-03-01..1987-03-31
+        terms = []
+        filters = {}
+        date_from = None
+        date_to = None
+
+        for token in query.split():
+            if token == "AND":
+                continue
+
+            name, _, value = token.partition(":")
+            if name in self.facets and value:
+                filters.setdefault(name, []).extend(value.split(","))
+            elif name == "date" and value:
+                date_from, separator, date_to = value.partition("..")
+                # A single date such as date:1987-03-05 is that one day
+                if not separator:
+                    date_to = date_from
+                # Check the bounds here so a bad filter is reported before any searching
+                for date in (date_from, date_to):
+                    if date:
+                        self.parse_date(date)
+            else:
+                terms.append(token)
+
+        return terms, filters, date_from or None, date_to or None
+
+    def print_results(self, query):
+        start_time = time.perf_counter()
+        terms, filters, date_from, date_to = self.parse_query(query)
+        docs = self.search(terms, filters, date_from, date_to)
+        query_time = time.perf_counter() - start_time
+
+        print(f"'{query}': {len(docs)} documents in {query_time * 1000:.2f} ms : {docs[:20]}{' ...' if len(docs) > 20 else ''}")
+
+        start_time = time.perf_counter()
+        for facet in self.facets:
+            print(f"    {facet}: {self.facet_counts(docs, facet, top=5)}")
+        print(f"    facet counts computed in {(time.perf_counter() - start_time) * 1000:.2f} ms")
+
+    def validate_queries(self):
+        test_queries = [
+            "copper",
+            "title:COPPER",
+            "copper topics:copper",
+            "Chrysler places:usa date:1987-03-01..1987-03-31",
+            "title:BUNDESBANK AND rates topics:interest",
+            "debt AND Brazil orgs:imf,worldbank"
+        ]
+
+        print("\nValidating Faceted Queries:")
+        for query in test_queries:
+            self.print_results(query)
+
+    def get_statistics(self):
+        fielded_terms = sum(1 for term in self.postings_list if ":" in term)
+
+        return {
+            'document_count': self.document_count,
+            'vocabulary_size': len(self.postings_list) - fielded_terms,
+            'fielded_terms': fielded_terms,
+            'facet_values': {facet: len(self.facet_bitmaps[facet]) for facet in self.facets},
+            'dated_documents': len(self.date_column)
+        }
+
+if __name__ == "__main__":
+    # Test the faceted indexer
+    faceted_indexer = FacetedIndexer(dataset_path="./reuters21578")
+
+    # Show statistics
+    print("\nFaceted Indexing Statistics:")
+    print(faceted_indexer.get_statistics())
+    print(f"Processed {faceted_indexer.document_count} documents in {faceted_indexer.document_process_time:.2f} seconds")
+
+    # Validating fielded and filtered queries
+    faceted_indexer.validate_queries()
+
+    # Test the search
+    while True:
+        query = input("\nEnter a query, e.g. 'title:COPPER topics:copper date:1987-03-01..1987-03-31' (or '0' to quit): ")
+
+        if query == '0':
+            break
+
+        if query:
+            try:
+                faceted_indexer.print_results(query)
+            except ValueError as error:
+                print(f"{error}, e.g. date:1987-03-05, date:1987-03-01..1987-03-31, date:1987-03-01.. or date:..1987-03-31")
@@ -27,9 +27,10 @@ class TermDocumentPair:
         return hash((self.term, self.doc_id))
 
 class NaiveIndexer:    
-    def __init__(self, dataset_path):
+    def __init__(self, dataset_path, parser=None):
         self.dataset_path = dataset_path
-        self.parser = ReutersParser(dataset_path)
+        # An already parsed corpus can be passed in to time the indexing on its own
+        self.parser = parser or ReutersParser(dataset_path)
         self.term_doc_pairs = []
         self.postings_list = {}
         self.document_count = 0
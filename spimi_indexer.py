@@ -7,9 +7,10 @@ from tqdm import tqdm
 from document_parser import ReutersParser
 
 class SPIMIIndexer:    
-    def __init__(self, dataset_path):
+    def __init__(self, dataset_path, parser=None):
         self.dataset_path = dataset_path
-        self.parser = ReutersParser(dataset_path)
+        # An already parsed corpus can be passed in to time the indexing on its own
+        self.parser = parser or ReutersParser(dataset_path)
         self.postings_list = {}
         self.document_count = 0
         self.document_process_time = 0
@@ -0,0 +1,195 @@
+#This program implements the following:
+#    Wildcard and prefix querying (e.g. Chrys*, *bank, Bun*bank) using a permuterm index
+
+import re
+import sys
+import time
+import heapq
+from bisect import bisect_left
+from spimi_indexer import SPIMIIndexer
+from naive_indexer import NaiveIndexer
+
+class PermutermIndex:
+    def __init__(self, indexer, max_expansions=500):
+        # Works on the vocabulary of any indexer exposing postings_list (NaiveIndexer, SPIMIIndexer)
+        self.indexer = indexer
+        self.max_expansions = max_expansions
+        self.rotations = []
+        self.rotation_terms = []
+        self.last_query_stats = {}
+        self.build_permuterm()
+
+    def build_permuterm(self):
+        # Every rotation of term$ points back to the term, kept as a sorted array for binary search
+        pairs = []
+        for term in self.indexer.postings_list:
+            if not term.strip():
+                continue
+
+            augmented = term + "$"
+            for i in range(len(augmented)):
+                pairs.append((augmented[i:] + augmented[:i], term))
+
+        pairs.sort()
+        self.rotations = [rotation for rotation, _ in pairs]
+        self.rotation_terms = [term for _, term in pairs]
+
+    def permuterm_key(self, pattern):
+        # X* -> $X, *X -> X$, X*Y -> Y$X, *X* -> X
+        # Patterns with more than one '*' use the outer parts and rely on the post-filter for the rest
+        parts = pattern.split("*")
+        first, last = parts[0], parts[-1]
+
+        if not first and not last:
+            middle = [part for part in parts[1:-1] if part]
+            return max(middle, key=len) if middle else ""
+
+        return last + "$" + first
+
+    def prefix_range(self, key):
+        # Rotations starting with key sit between key and key + the highest character
+        start = bisect_left(self.rotations, key)
+        end = bisect_left(self.rotations, key + "\uffff", start)
+        return start, end
+
+    def expand_pattern(self, pattern):
+        pattern = pattern.strip()
+        if "*" not in pattern:
+            return [pattern] if pattern in self.indexer.postings_list else [], False
+
+        key = self.permuterm_key(pattern)
+        if not key:
+            # '*' matches the whole vocabulary, take the first terms from the $term rotations
+            start, end = self.prefix_range("$")
+            terms = self.rotation_terms[start:min(end, start + self.max_expansions)]
+            return terms, end - start > self.max_expansions
+
+        # Candidate terms from the permuterm lookup are verified against the full pattern,
+        # stopping as soon as the expansion cap is hit
+        verifier = re.compile(".*".join(re.escape(part) for part in pattern.split("*")))
+        start, end = self.prefix_range(key)
+
+        terms = []
+        seen = set()
+        truncated = False
+        for i in range(start, end):
+            term = self.rotation_terms[i]
+            if term in seen:
+                continue
+            seen.add(term)
+
+            if verifier.fullmatch(term):
+                if len(terms) == self.max_expansions:
+                    truncated = True
+                    break
+                terms.append(term)
+
+        return sorted(terms), truncated
+
+    def union_postings(self, postings_lists):
+        # OR-merge of docID-sorted postings through a heap, dropping duplicates as they come out
+        result = []
+        for doc_id in heapq.merge(*postings_lists, key=int):
+            if not result or result[-1] != doc_id:
+                result.append(doc_id)
+        return result
+
+    #Wildcard Querying
+    def search_wildcard(self, pattern):
+        start_time = time.perf_counter()
+
+        terms, truncated = self.expand_pattern(pattern)
+        result = self.union_postings([self.indexer.search_term(term) for term in terms])
+
+        self.last_query_stats = {
+            'pattern': pattern.strip(),
+            'expanded_terms': len(terms),
+            'truncated': truncated,
+            'latency_ms': (time.perf_counter() - start_time) * 1000
+        }
+        return result
+
+    #Wildcard AND Querying
+    def search_and_query(self, patterns):
+        start_time = time.perf_counter()
+
+        expanded_terms = 0
+        truncated = False
+        result = None
+        for pattern in patterns:
+            postings = self.search_wildcard(pattern)
+            expanded_terms += self.last_query_stats['expanded_terms']
+            truncated = truncated or self.last_query_stats['truncated']
+
+            result = postings if result is None else self.indexer.intersect_postings(result, postings)
+            if not result:
+                break
+
+        self.last_query_stats = {
+            'pattern': ' AND '.join(pattern.strip() for pattern in patterns),
+            'expanded_terms': expanded_terms,
+            'truncated': truncated,
+            'latency_ms': (time.perf_counter() - start_time) * 1000
+        }
+        return result or []
+
+    def print_last_query(self, docs):
+        stats = self.last_query_stats
+        print(f"'{stats['pattern']}': {len(docs)} documents from {stats['expanded_terms']} terms"
+              f"{' (truncated)' if stats['truncated'] else ''} in {stats['latency_ms']:.2f} ms")
+
+    def validate_queries(self):
+        test_patterns = ["Chrys*", "*bank", "Bundes*", "cop*er", "*oppe*", "Bun*ba*k"]
+        print("\nValidating Wildcard Queries:")
+        for pattern in test_patterns:
+            docs = self.search_wildcard(pattern)
+            self.print_last_query(docs)
+            print(f"    terms: {self.expand_pattern(pattern)[0][:10]}")
+
+        test_and_queries = [
+            ["Chrys*", "car*"],
+            ["gold", "*stock*"]
+        ]
+
+        print("\nValidating Wildcard AND Queries:")
+        for patterns in test_and_queries:
+            docs = self.search_and_query(patterns)
+            self.print_last_query(docs)
+
+    def get_statistics(self):
+        return {
+            'vocabulary_size': len(set(self.rotation_terms)),
+            'rotations': len(self.rotations),
+            'max_expansions': self.max_expansions
+        }
+
+if __name__ == "__main__":
+    # Build the permuterm index over the SPIMI vocabulary (pass "naive" to use the naive indexer)
+    if len(sys.argv) > 1 and sys.argv[1] == "naive":
+        indexer = NaiveIndexer(dataset_path="./reuters21578")
+    else:
+        indexer = SPIMIIndexer(dataset_path="./reuters21578")
+
+    start_time = time.time()
+    permuterm_index = PermutermIndex(indexer)
+    print(f"\nPermuterm index built in {time.time() - start_time:.2f} seconds")
+    print(permuterm_index.get_statistics())
+
+    permuterm_index.validate_queries()
+
+    # Test the search
+    while True:
+        pattern = input("\nEnter a wildcard query (or '0' to quit): ")
+
+        if pattern == '0':
+            break
+
+        if pattern:
+            if(len(re.split("AND", pattern))>1):
+                docs = permuterm_index.search_and_query(re.split("AND", pattern))
+            else:
+                docs = permuterm_index.search_wildcard(pattern)
+
+            permuterm_index.print_last_query(docs)
+            if docs:
+                print(f"Documents : {docs}")